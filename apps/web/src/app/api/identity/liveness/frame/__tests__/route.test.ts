@@ -0,0 +1,62 @@
+import { beforeEach, describe, expect, it, vi } from "vitest";
+
+vi.mock("next/headers", () => ({
+  headers: vi.fn(async () => new Headers()),
+}));
+
+vi.mock("@/lib/auth/session", () => ({
+  getCachedSession: vi.fn(),
+}));
+
+const livenessMocks = vi.hoisted(() => ({
+  advanceFrame: vi.fn(),
+  MAX_FRAME_BYTES: 1024,
+}));
+
+vi.mock("@/lib/identity/liveness/session", () => livenessMocks);
+
+import { getCachedSession } from "@/lib/auth/session";
+
+import { POST } from "../route";
+
+const PNG_BYTES = new Uint8Array([
+  0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a,
+]);
+const JPEG_BYTES = new Uint8Array([0xff, 0xd8, 0xff, 0xe0, 0x00, 0x10]);
+
+const makeRequest = (body: Uint8Array) =>
+  new Request("http://localhost/api/identity/liveness/frame?sessionId=s-1", {
+    method: "POST",
+    body,
+  });
+
+describe("liveness frame route", () => {
+  beforeEach(() => {
+    vi.clearAllMocks();
+    vi.mocked(getCachedSession).mockResolvedValue({
+      user: { id: "user-1" },
+    } as never);
+    livenessMocks.advanceFrame.mockResolvedValue({ phase: "detecting" });
+  });
+
+  it("rejects a non-JPEG frame with 415 before processing it", async () => {
+    const response = await POST(makeRequest(PNG_BYTES));
+
+    expect(response.status).toBe(415);
+    await expect(response.json()).resolves.toEqual({
+      error: "Frame must be a JPEG image",
+    });
+    expect(livenessMocks.advanceFrame).not.toHaveBeenCalled();
+  });
+
+  it("passes a JPEG frame to the liveness engine", async () => {
+    const response = await POST(makeRequest(JPEG_BYTES));
+
+    expect(response.status).toBe(200);
+    expect(livenessMocks.advanceFrame).toHaveBeenCalledWith({
+      sessionId: "s-1",
+      userId: "user-1",
+      frame: Buffer.from(JPEG_BYTES),
+    });
+  });
+});
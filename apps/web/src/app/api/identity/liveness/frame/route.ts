@@ -4,6 +4,7 @@ import { NextResponse } from "next/server";
 import { getCachedSession } from "@/lib/auth/session";
 import { jsonError } from "@/lib/http/route-responses";
 import { LivenessErrorState } from "@/lib/identity/liveness/errors";
+import { isJpeg } from "@/lib/identity/liveness/human/server";
 import { advanceFrame, MAX_FRAME_BYTES } from "@/lib/identity/liveness/session";
 
 export async function POST(request: Request): Promise<Response> {
@@ -24,6 +25,11 @@ export async function POST(request: Request): Promise<Response> {
   if (buffer.byteLength > MAX_FRAME_BYTES) {
     return jsonError("Frame too large", 413);
   }
+  // The capture client only sends JPEG. Reject anything else before it
+  // reaches the decoder and models (and before it could become the baseline).
+  if (!isJpeg(buffer)) {
+    return jsonError("Frame must be a JPEG image", 415);
+  }
 
   const outcome = await advanceFrame({
     sessionId,
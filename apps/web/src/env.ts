@@ -248,6 +248,13 @@ export const env = createEnv({
     OTEL_EXPORTER_OTLP_HEADERS: z.string().optional(),
     OTEL_METRICS_EXPORT_INTERVAL_MS: z.coerce.number().default(60_000),
 
+    // Liveness
+    LIVENESS_MAX_CONCURRENT_DETECTIONS: z.coerce
+      .number()
+      .int()
+      .min(1)
+      .default(2),
+
     // Misc
     ZENTITY_ADMIN_API_KEY: z.string().optional(),
     DEMO_MODE: booleanString.optional(),
@@ -386,6 +393,8 @@ export const env = createEnv({
     OTEL_EXPORTER_OTLP_HEADERS: process.env.OTEL_EXPORTER_OTLP_HEADERS,
     OTEL_METRICS_EXPORT_INTERVAL_MS:
       process.env.OTEL_METRICS_EXPORT_INTERVAL_MS,
+    LIVENESS_MAX_CONCURRENT_DETECTIONS:
+      process.env.LIVENESS_MAX_CONCURRENT_DETECTIONS,
     ZENTITY_ADMIN_API_KEY: process.env.ZENTITY_ADMIN_API_KEY,
     DEMO_MODE: process.env.DEMO_MODE,
     E2E_OIDC_ONLY: process.env.E2E_OIDC_ONLY,
@@ -1,40 +1,62 @@
-import { stripDataUrl } from "@/lib/identity/liveness/human/server";
+import type { Tensor3D } from "@tensorflow/tfjs-node";
+
+import { isJpeg } from "@/lib/identity/liveness/human/server";
+
+/** Long side of the ID face preview; the UI renders it at 80px (2x for HiDPI). */
+const PREVIEW_MAX_SIDE = 160;
+const PREVIEW_JPEG_QUALITY = 75;
+
+export interface FaceCrop {
+  /** Small JPEG data URL of the crop, for display only. */
+  previewDataUrl: string;
+  /** Full-resolution crop pixels. The caller owns this tensor and must dispose it. */
+  tensor: Tensor3D;
+}
 
 /**
- * Crop face region from image and return as base64 data URL.
+ * Crop face region from image.
  * This improves embedding quality for small faces in large documents.
  *
- * @param dataUrl - Base64 encoded image data URL
- * @param box - Face bounding box coordinates
+ * The crop is returned as a tensor so it can be passed straight to detection
+ * (no JPEG encode/decode round trip), alongside a downscaled preview for the UI.
+ *
+ * @param image - Encoded image bytes (already base64-decoded by the caller)
+ * @param box - Face bounding box, normalized to [0, 1] of the image size
+ *   (Human.js `boxRaw`), so it stays valid if detection ran on a resized copy
  * @param padding - Padding around face (default 30%)
- * @returns Base64 data URL of cropped face region
+ * @returns Crop tensor and preview data URL of the face region
  */
 export async function cropFaceRegion(
-  dataUrl: string,
+  image: Buffer,
   box: { x: number; y: number; width: number; height: number },
   padding = 0.3
-): Promise<string> {
+): Promise<FaceCrop> {
   const tf = await import("@tensorflow/tfjs-node");
 
-  const base64 = stripDataUrl(dataUrl);
-  const buffer = Buffer.from(base64, "base64");
-  const decoded = tf.node.decodeImage(buffer, 3);
+  const decoded = isJpeg(image)
+    ? tf.node.decodeJpeg(image, 3)
+    : tf.node.decodeImage(image, 3);
   if (decoded.rank !== 3) {
     decoded.dispose();
     throw new Error("Animated images are not supported");
   }
-  const tensor = decoded;
+  // Safe because we verified rank === 3 above
+  const tensor = decoded as Tensor3D;
 
   const height = tensor.shape[0];
   const width = tensor.shape[1];
 
-  // Calculate padded crop region
-  const padW = box.width * padding;
-  const padH = box.height * padding;
-  const x1 = Math.max(0, Math.floor(box.x - padW));
-  const y1 = Math.max(0, Math.floor(box.y - padH));
-  const x2 = Math.min(width, Math.ceil(box.x + box.width + padW));
-  const y2 = Math.min(height, Math.ceil(box.y + box.height + padH));
+  // Calculate padded crop region in pixels
+  const boxX = box.x * width;
+  const boxY = box.y * height;
+  const boxW = box.width * width;
+  const boxH = box.height * height;
+  const padW = boxW * padding;
+  const padH = boxH * padding;
+  const x1 = Math.max(0, Math.floor(boxX - padW));
+  const y1 = Math.max(0, Math.floor(boxY - padH));
+  const x2 = Math.min(width, Math.ceil(boxX + boxW + padW));
+  const y2 = Math.min(height, Math.ceil(boxY + boxH + padH));
 
   const cropWidth = x2 - x1;
   const cropHeight = y2 - y1;
@@ -42,14 +64,45 @@ export async function cropFaceRegion(
   const cropped = tf.slice(tensor, [y1, x1, 0], [cropHeight, cropWidth, 3]);
   tensor.dispose();
 
-  // Cast to unknown first to bypass TypeScript's strict union type checking
-  // Safe because we verified rank === 3 above
-  const encoded = await tf.node.encodeJpeg(
-    cropped as unknown as Parameters<typeof tf.node.encodeJpeg>[0],
-    "rgb",
-    95
+  try {
+    const previewDataUrl = await encodePreview(tf, cropped);
+    return { tensor: cropped, previewDataUrl };
+  } catch (error) {
+    cropped.dispose();
+    throw error;
+  }
+}
+
+async function encodePreview(
+  tf: typeof import("@tensorflow/tfjs-node"),
+  face: Tensor3D
+): Promise<string> {
+  const [height, width] = face.shape;
+  const scale = Math.min(1, PREVIEW_MAX_SIDE / Math.max(height, width));
+  const preview = tf.tidy(() =>
+    tf.cast(
+      tf.image.resizeBilinear(face, [
+        Math.max(1, Math.round(height * scale)),
+        Math.max(1, Math.round(width * scale)),
+      ]),
+      "int32"
+    )
   );
-  cropped.dispose();
 
-  return `data:image/jpeg;base64,${Buffer.from(encoded).toString("base64")}`;
+  try {
+    const encoded = await tf.node.encodeJpeg(
+      preview,
+      "rgb",
+      PREVIEW_JPEG_QUALITY
+    );
+    // Wrap the encoder's bytes without copying them before base64-encoding.
+    const jpeg = Buffer.from(
+      encoded.buffer,
+      encoded.byteOffset,
+      encoded.byteLength
+    );
+    return `data:image/jpeg;base64,${jpeg.toString("base64")}`;
+  } finally {
+    preview.dispose();
+  }
 }
@@ -10,6 +10,7 @@ import {
 } from "@/lib/db/queries/identity";
 
 import {
+  getEmbeddingVector,
   getFacingDirection,
   getHappyScore,
   getLiveScore,
@@ -18,10 +19,16 @@ import {
   getYawDegrees,
 } from "../human/metrics";
 import { detectFromBuffer } from "../human/server";
-import { advanceFrame, createLivenessSession, hashSelfie } from "../session";
+import {
+  advanceFrame,
+  createLivenessSession,
+  hashSelfie,
+  takeBaselineEmbedding,
+} from "../session";
 
 vi.mock("../human/server", () => ({ detectFromBuffer: vi.fn() }));
 vi.mock("../human/metrics", () => ({
+  getEmbeddingVector: vi.fn(),
   getFacingDirection: vi.fn(),
   getHappyScore: vi.fn(),
   getLiveScore: vi.fn(),
@@ -54,6 +61,7 @@ const real = vi.mocked(getRealScore);
 const live = vi.mocked(getLiveScore);
 const yaw = vi.mocked(getYawDegrees);
 const facing = vi.mocked(getFacingDirection);
+const embedding = vi.mocked(getEmbeddingVector);
 const draftById = vi.mocked(getIdentityDraftById);
 const writeDraft = vi.mocked(updateIdentityDraft);
 
@@ -68,6 +76,7 @@ beforeEach(() => {
   live.mockReturnValue(0.95);
   yaw.mockReturnValue(0);
   facing.mockReturnValue("center");
+  embedding.mockReturnValue(null);
 });
 
 afterEach(() => {
@@ -233,3 +242,45 @@ describe("liveness terminal write (the trust boundary)", () => {
     expect(writeDraft).not.toHaveBeenCalled();
   });
 });
+
+describe("baseline embedding handoff to faceMatch", () => {
+  async function completeWithEmbedding(): Promise<string> {
+    embedding.mockReturnValue([0.1, 0.2, 0.3]);
+    const { sessionId } = createLivenessSession({
+      userId: USER,
+      draftId: null,
+      challengeCount: 1,
+    });
+    const outcome = await driveToCompletion(sessionId);
+    expectPhase(outcome, "completed");
+    return hashSelfie((outcome as { selfieImage: string }).selfieImage);
+  }
+
+  it("hands the embedding to the owning user exactly once", async () => {
+    const selfieHash = await completeWithEmbedding();
+
+    expect(takeBaselineEmbedding(selfieHash, "user-b")).toBeNull();
+    expect(takeBaselineEmbedding(selfieHash, USER)).toEqual([0.1, 0.2, 0.3]);
+    expect(takeBaselineEmbedding(selfieHash, USER)).toBeNull();
+  });
+
+  it("drops the embedding once its TTL has elapsed", async () => {
+    const selfieHash = await completeWithEmbedding();
+
+    vi.advanceTimersByTime(5 * 60 * 1000 + 1);
+    expect(takeBaselineEmbedding(selfieHash, USER)).toBeNull();
+  });
+
+  it("deletes an unclaimed embedding from the store at its TTL", async () => {
+    const selfieHash = await completeWithEmbedding();
+    const store = (
+      globalThis as unknown as {
+        livenessBaselineEmbeddings: Map<string, unknown>;
+      }
+    ).livenessBaselineEmbeddings;
+    expect(store.has(selfieHash)).toBe(true);
+
+    vi.advanceTimersByTime(5 * 60 * 1000 + 1);
+    expect(store.has(selfieHash)).toBe(false);
+  });
+});
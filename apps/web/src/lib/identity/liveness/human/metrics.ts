@@ -170,19 +170,21 @@ export function getPrimaryFace(result: unknown): HumanFaceResult | null {
 export function getLargestFace(result: unknown): HumanFaceResult | null {
   const res = result as HumanDetectionResult | null;
   const faces = Array.isArray(res?.face) ? res.face : [];
-  if (faces.length === 0) {
-    return null;
-  }
 
-  const first = faces[0];
-  if (!first) {
-    return null;
+  // Single pass that tracks the best area instead of recomputing it per face.
+  let best: HumanFaceResult | null = null;
+  let bestArea = -1;
+  for (const face of faces) {
+    if (!face) {
+      continue;
+    }
+    const area = getBoxArea(face.box ?? undefined);
+    if (area > bestArea) {
+      best = face;
+      bestArea = area;
+    }
   }
-  return faces.reduce((best, face) => {
-    const bestArea = getBoxArea(best?.box ?? undefined);
-    const area = getBoxArea(face?.box ?? undefined);
-    return area > bestArea ? face : best;
-  }, first);
+  return best;
 }
 
 function getGestureNames(result: unknown): string[] {
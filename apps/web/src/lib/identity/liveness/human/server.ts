@@ -1,5 +1,6 @@
 import "server-only";
 
+import type { Tensor3D } from "@tensorflow/tfjs-node";
 import type { Config, Human } from "@vladmandic/human";
 
 import fs from "node:fs";
@@ -7,6 +8,7 @@ import path from "node:path";
 import { pathToFileURL } from "node:url";
 import util from "node:util";
 
+import { env } from "@/env";
 import { logger } from "@/lib/logging/logger";
 import { recordLivenessDetectDuration } from "@/lib/observability/metrics";
 
@@ -58,7 +60,7 @@ const serverConfig: Partial<Config> = {
       maxDetected: 1, // Only need one face for liveness
     },
     mesh: { enabled: true },
-    iris: { enabled: true }, // For eye tracking in liveness
+    iris: { enabled: false }, // Not needed: no challenge reads eye or gaze data
     description: { enabled: true }, // Needed for face embeddings
     emotion: { enabled: true },
     attention: { enabled: false }, // Not needed for gesture-based liveness
@@ -76,8 +78,12 @@ const serverConfig: Partial<Config> = {
   },
 };
 
+type TfNode = typeof import("@tensorflow/tfjs-node");
+
 let humanInstance: Human | null = null;
 let initPromise: Promise<Human> | null = null;
+// Resolved once during init so detections don't re-run a dynamic import per call.
+let tfNode: TfNode | null = null;
 
 /**
  * Counting semaphore for limiting concurrent TensorFlow detections.
@@ -116,9 +122,11 @@ class Semaphore {
 }
 
 // Allow 2 concurrent detections by default. This is conservative but safe.
-// Increase to 3-4 if testing shows no issues on your hardware.
-const MAX_CONCURRENT_DETECTIONS = 2;
-const detectionSemaphore = new Semaphore(MAX_CONCURRENT_DETECTIONS);
+// Raise LIVENESS_MAX_CONCURRENT_DETECTIONS to 3-4 on hosts with spare cores
+// if testing shows no issues on your hardware.
+const detectionSemaphore = new Semaphore(
+  env.LIVENESS_MAX_CONCURRENT_DETECTIONS
+);
 
 export function getHumanServer(): Promise<Human> {
   if (humanInstance) {
@@ -126,14 +134,19 @@ export function getHumanServer(): Promise<Human> {
   }
   initPromise ??= (async () => {
     // Load TensorFlow native backend only on the server.
-    await import("@tensorflow/tfjs-node");
+    tfNode = await import("@tensorflow/tfjs-node");
     const mod = await import("@vladmandic/human");
     const human = new mod.Human(serverConfig);
     await human.load();
     await human.warmup();
     humanInstance = human;
     return human;
-  })();
+  })().catch((error: unknown) => {
+    // Don't memoize a failed load: a transient startup failure would
+    // otherwise fail every detection until the process restarts.
+    initPromise = null;
+    throw error;
+  });
   return initPromise;
 }
 
@@ -142,66 +155,96 @@ export function stripDataUrl(input: string): string {
   return comma >= 0 ? input.slice(comma + 1) : input;
 }
 
-/**
- * Decode a base64 data URL to a tensor for server-side Human.js detection.
- * tfjs-node cannot directly process base64 strings like the browser version.
- */
 // TensorFlow tensor type from dynamic import
-type TfTensor = Awaited<
-  ReturnType<typeof import("@tensorflow/tfjs-node")["node"]["decodeImage"]>
->;
-
-async function decodeBase64Image(dataUrl: string): Promise<TfTensor> {
-  const tf = await import("@tensorflow/tfjs-node");
-  const base64 = stripDataUrl(dataUrl);
-  const buffer = Buffer.from(base64, "base64");
-  return decodeBuffer(tf, buffer);
+type TfTensor = Awaited<ReturnType<TfNode["node"]["decodeImage"]>>;
+
+/** JPEG SOI marker check, used to route decodes to the libjpeg-turbo path. */
+export function isJpeg(buffer: Buffer): boolean {
+  return (
+    buffer.length > 2 &&
+    buffer[0] === 0xff &&
+    buffer[1] === 0xd8 &&
+    buffer[2] === 0xff
+  );
 }
 
-function decodeBuffer(
-  tf: typeof import("@tensorflow/tfjs-node"),
-  buffer: Buffer
-): TfTensor {
+function decodeBuffer(tf: TfNode, buffer: Buffer): TfTensor {
+  // Liveness frames and most selfies are JPEG: decode them straight through
+  // libjpeg-turbo instead of letting decodeImage sniff the container first.
+  if (isJpeg(buffer)) {
+    return tf.node.decodeJpeg(buffer, 3);
+  }
   // decodeImage returns a 3D or 4D tensor (height, width, channels)
   return tf.node.decodeImage(buffer, 3);
 }
 
 /**
- * Run Human.js detection on a base64 image (server-side).
- * Uses a semaphore to limit concurrent detections and prevent resource exhaustion.
+ * Longest image side handed to Human.js. The face detector runs at a few
+ * hundred pixels, so larger inputs (phone-scanned IDs) only add full-resolution
+ * filter and crop work. Boxes come back in the resized space; `boxRaw` is
+ * normalized and maps onto the original image.
  */
-export async function detectFromBase64(dataUrl: string) {
-  const start = performance.now();
-  let result: "ok" | "error" = "ok";
-
-  await detectionSemaphore.acquire();
+const MAX_DETECTION_SIDE = 1280;
 
-  let tensor: TfTensor | null = null;
-  try {
-    const human = await getHumanServer();
-    tensor = await decodeBase64Image(dataUrl);
-    return await human.detect(tensor);
-  } catch (error) {
-    result = "error";
-    throw error;
-  } finally {
-    // Dispose tensor to prevent memory leaks
-    try {
-      tensor?.dispose();
-    } catch {
-      // ignore dispose errors
-    }
-    detectionSemaphore.release();
-    recordLivenessDetectDuration(performance.now() - start, { result });
+function fitForDetection(tf: TfNode, tensor: TfTensor): TfTensor {
+  if (tensor.rank !== 3) {
+    return tensor;
   }
+  const image = tensor as Tensor3D;
+  const [height, width] = image.shape;
+  const scale = MAX_DETECTION_SIDE / Math.max(height, width);
+  if (scale >= 1) {
+    return tensor;
+  }
+  const resized = tf.tidy(() =>
+    tf.cast(
+      tf.image.resizeBilinear(image, [
+        Math.round(height * scale),
+        Math.round(width * scale),
+      ]),
+      "int32"
+    )
+  );
+  tensor.dispose();
+  return resized;
+}
+
+/**
+ * Run Human.js detection on a base64 image (server-side).
+ * The base64 payload is decoded before queueing on the detection semaphore,
+ * so waiting callers don't hold a permit while doing string work.
+ */
+export function detectFromBase64(dataUrl: string) {
+  return detectFromBuffer(Buffer.from(stripDataUrl(dataUrl), "base64"));
 }
 
 /**
  * Run Human.js detection directly from a Buffer (server-side).
  * Skips base64 encoding overhead - use when you already have binary image data.
- * Uses the same semaphore as detectFromBase64 to limit concurrent detections.
  */
-export async function detectFromBuffer(buffer: Buffer) {
+export function detectFromBuffer(buffer: Buffer) {
+  return runDetection(
+    (tf) => fitForDetection(tf, decodeBuffer(tf, buffer)),
+    true
+  );
+}
+
+/**
+ * Run Human.js detection on an already-decoded RGB tensor (e.g. a face crop).
+ * The caller keeps ownership of the tensor and must dispose it.
+ */
+export function detectFromTensor(tensor: Tensor3D) {
+  return runDetection(() => tensor, false);
+}
+
+/**
+ * Shared detection path. Uses a semaphore to limit concurrent detections and
+ * prevent resource exhaustion; disposes the input only when it created it.
+ */
+async function runDetection(
+  getInput: (tf: TfNode) => TfTensor,
+  ownsInput: boolean
+) {
   const start = performance.now();
   let result: "ok" | "error" = "ok";
 
@@ -209,16 +252,21 @@ export async function detectFromBuffer(buffer: Buffer) {
 
   let tensor: TfTensor | null = null;
   try {
-    const tf = await import("@tensorflow/tfjs-node");
     const human = await getHumanServer();
-    tensor = decodeBuffer(tf, buffer);
+    if (!tfNode) {
+      throw new Error("TensorFlow backend not loaded");
+    }
+    tensor = getInput(tfNode);
     return await human.detect(tensor);
   } catch (error) {
     result = "error";
     throw error;
   } finally {
+    // Dispose tensors we decoded to prevent memory leaks
     try {
-      tensor?.dispose();
+      if (ownsInput) {
+        tensor?.dispose();
+      }
     } catch {
       // ignore dispose errors
     }
@@ -233,7 +281,17 @@ export async function detectFromBuffer(buffer: Buffer) {
  */
 export async function warmupHumanServer(): Promise<void> {
   const startTime = Date.now();
-  await getHumanServer();
+  try {
+    await getHumanServer();
+  } catch (error) {
+    // instrumentation.ts settles warmups without inspecting them; surface the
+    // failure here. The next detection retries the load (see getHumanServer).
+    logger.error(
+      { err: error, durationMs: Date.now() - startTime },
+      "Human.js model preload failed"
+    );
+    throw error;
+  }
   logger.info(
     { durationMs: Date.now() - startTime },
     "Human.js models preloaded"
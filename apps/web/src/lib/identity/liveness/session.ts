@@ -38,6 +38,7 @@ import { logger } from "@/lib/logging/logger";
 
 import { LivenessErrorState } from "./errors";
 import {
+  getEmbeddingVector,
   getFacingDirection,
   getHappyScore,
   getLiveScore,
@@ -94,6 +95,8 @@ type DetectionResult = Awaited<ReturnType<typeof detectFromBuffer>>;
 type DetectedFace = NonNullable<ReturnType<typeof getPrimaryFace>>;
 
 interface LivenessSession {
+  /** Embedding of the baseline face, handed to faceMatch on completion. */
+  baselineEmbedding: number[] | null;
   /** Data URL of the baseline frame the server scored; hashed into verifiedSelfieHash. */
   baselineFrame: string | null;
 
@@ -140,12 +143,18 @@ const sessions =
   globalForLiveness.livenessSessions ?? new Map<string, LivenessSession>();
 globalForLiveness.livenessSessions = sessions;
 
+/**
+ * Map iteration follows insertion order, and sessions are inserted once at
+ * creation, so the oldest sessions come first: stop at the first live one
+ * instead of scanning the whole store on every create.
+ */
 function cleanupExpiredSessions(): void {
   const cutoff = Date.now() - SESSION_TTL_MS;
   for (const [id, session] of sessions) {
-    if (session.startedAt < cutoff) {
-      sessions.delete(id);
+    if (session.startedAt >= cutoff) {
+      break;
     }
+    sessions.delete(id);
   }
 }
 
@@ -162,15 +171,81 @@ export function hashSelfie(selfieDataUrl: string): string {
   return createHash("sha256").update(selfieDataUrl).digest("hex");
 }
 
+// ---------------------------------------------------------------------------
+// Baseline embedding handoff (liveness -> faceMatch)
+// ---------------------------------------------------------------------------
+
+/** How long a completed session's baseline embedding waits for faceMatch. */
+const BASELINE_EMBEDDING_TTL_MS = 5 * 60 * 1000;
+
+interface StashedEmbedding {
+  embedding: number[];
+  expiresAt: number;
+  userId: string;
+}
+
+const globalForBaseline = globalThis as unknown as {
+  livenessBaselineEmbeddings?: Map<string, StashedEmbedding>;
+};
+const baselineEmbeddings =
+  globalForBaseline.livenessBaselineEmbeddings ??
+  new Map<string, StashedEmbedding>();
+globalForBaseline.livenessBaselineEmbeddings = baselineEmbeddings;
+
+/**
+ * Keep the completed session's baseline embedding, keyed by the canonical
+ * selfie hash, so faceMatch can skip re-detecting the exact frame the engine
+ * already scored. Each entry is removed at its TTL even if faceMatch never
+ * claims it (abandoned flow, rejected draft), so the template is not retained.
+ */
+function stashBaselineEmbedding(session: LivenessSession): void {
+  if (!(session.baselineFrame && session.baselineEmbedding)) {
+    return;
+  }
+  const hash = hashSelfie(session.baselineFrame);
+  const entry: StashedEmbedding = {
+    embedding: session.baselineEmbedding,
+    expiresAt: Date.now() + BASELINE_EMBEDDING_TTL_MS,
+    userId: session.userId,
+  };
+  baselineEmbeddings.set(hash, entry);
+  setTimeout(() => {
+    // A later completion with the same selfie may have replaced this entry.
+    if (baselineEmbeddings.get(hash) === entry) {
+      baselineEmbeddings.delete(hash);
+    }
+  }, BASELINE_EMBEDDING_TTL_MS).unref();
+}
+
+/**
+ * One-shot read of a stashed baseline embedding. Only the user whose session
+ * produced it can claim it, and only with the selfie that hashes to it.
+ */
+export function takeBaselineEmbedding(
+  selfieHash: string,
+  userId: string
+): number[] | null {
+  const entry = baselineEmbeddings.get(selfieHash);
+  if (!entry || entry.userId !== userId) {
+    return null;
+  }
+  baselineEmbeddings.delete(selfieHash);
+  return entry.expiresAt > Date.now() ? entry.embedding : null;
+}
+
 // ---------------------------------------------------------------------------
 // Session lifecycle
 // ---------------------------------------------------------------------------
 
-function generateChallenges(count: number): ChallengeType[] {
-  const pool: ChallengeType[] = ["smile", "turn_left", "turn_right"];
+const CHALLENGE_POOL: readonly ChallengeType[] = [
+  "smile",
+  "turn_left",
+  "turn_right",
+];
 
+function generateChallenges(count: number): ChallengeType[] {
   // Fisher-Yates with crypto.randomInt for an unpredictable sequence.
-  const shuffled = [...pool];
+  const shuffled = [...CHALLENGE_POOL];
   for (let i = shuffled.length - 1; i > 0; i--) {
     const j = randomInt(i + 1);
     const a = shuffled[i];
@@ -232,6 +307,7 @@ export function createLivenessSession(args: {
     turnStartYaw: null,
     turnCentered: false,
     baselineFrame: null,
+    baselineEmbedding: null,
     startedAt: now,
     countdownStartedAt: null,
     challengeStartedAt: null,
@@ -297,8 +373,13 @@ export async function advanceFrame(args: {
       : { detected: false, box: null };
     session.lastHappyScore = face ? getHappyScore(face) : null;
 
-    const dataUrl = `data:image/jpeg;base64,${args.frame.toString("base64")}`;
-    const outcome = await processPhase(session, result, face, dataUrl);
+    const outcome = await processPhase(
+      session,
+      result,
+      face,
+      args.frame,
+      now
+    );
 
     session.consecutiveErrors = 0;
     if (outcome.phase === "completed" || outcome.phase === "failed") {
@@ -324,19 +405,25 @@ export async function advanceFrame(args: {
   }
 }
 
+/**
+ * `now` is the frame's arrival time, read once in advanceFrame. Every phase
+ * timestamp and timeout check for the frame uses it, so detection latency
+ * doesn't skew countdown or challenge timing.
+ */
 function processPhase(
   session: LivenessSession,
   result: DetectionResult,
   face: ReturnType<typeof getPrimaryFace>,
-  dataUrl: string
+  frame: Buffer,
+  now: number
 ): Promise<AdvanceResult> | AdvanceResult {
   switch (session.phase) {
     case "detecting":
-      return processDetecting(session, face);
+      return processDetecting(session, face, now);
     case "countdown":
-      return processCountdown(session, face, dataUrl);
+      return processCountdown(session, face, frame, now);
     case "challenging":
-      return processChallenging(session, result, face);
+      return processChallenging(session, result, face, now);
     case "verifying":
       return processVerifying(session, face);
     default:
@@ -346,7 +433,8 @@ function processPhase(
 
 function processDetecting(
   session: LivenessSession,
-  face: ReturnType<typeof getPrimaryFace>
+  face: ReturnType<typeof getPrimaryFace>,
+  now: number
 ): AdvanceResult {
   if (!face) {
     session.consecutiveFaceDetections = 0;
@@ -359,7 +447,7 @@ function processDetecting(
   }
 
   session.phase = "countdown";
-  session.countdownStartedAt = Date.now();
+  session.countdownStartedAt = now;
   session.countdown = Math.ceil(session.timeouts.countdownDurationMs / 1000);
   return toSnapshot(session);
 }
@@ -372,7 +460,8 @@ function processDetecting(
 function processCountdown(
   session: LivenessSession,
   face: ReturnType<typeof getPrimaryFace>,
-  dataUrl: string
+  frame: Buffer,
+  now: number
 ): AdvanceResult {
   if (!face) {
     session.phase = "detecting";
@@ -382,22 +471,27 @@ function processCountdown(
     return withHint(session, "Face lost - please position your face again");
   }
 
-  const elapsed = Date.now() - (session.countdownStartedAt ?? Date.now());
+  const elapsed = now - (session.countdownStartedAt ?? now);
   const remaining = Math.max(0, session.timeouts.countdownDurationMs - elapsed);
   session.countdown = Math.ceil(remaining / 1000);
 
   if (elapsed < session.timeouts.countdownDurationMs) {
     return toSnapshot(session);
   }
-  return startFirstChallenge(session, dataUrl);
+  return startFirstChallenge(session, face, frame, now);
 }
 
 function startFirstChallenge(
   session: LivenessSession,
-  baselineDataUrl: string
+  face: DetectedFace,
+  baselineFrame: Buffer,
+  now: number
 ): AdvanceResult {
-  session.baselineFrame = baselineDataUrl;
+  // Only the baseline frame is ever serialized; encoding it here instead of
+  // per frame keeps a frame-sized base64 string off every other request.
+  session.baselineFrame = `data:image/jpeg;base64,${baselineFrame.toString("base64")}`;
   session.baselineHappy = session.lastHappyScore;
+  session.baselineEmbedding = getEmbeddingVector(face);
   session.countdown = null;
   session.countdownStartedAt = null;
 
@@ -407,29 +501,18 @@ function startFirstChallenge(
   }
   session.phase = "challenging";
   session.currentIndex = 0;
-  session.challenge = {
-    type: first,
-    index: 0,
-    total: session.challenges.length,
-    progress: 0,
-    hint: getHintForChallenge(first),
-  };
-  session.challengeStartedAt = Date.now();
-  session.consecutiveChallengePasses = 0;
-  session.turnCentered = false;
-  session.turnStartYaw = null;
-  return toSnapshot(session);
+  return beginChallenge(session, first, now);
 }
 
 function processChallenging(
   session: LivenessSession,
   result: DetectionResult,
-  face: ReturnType<typeof getPrimaryFace>
+  face: ReturnType<typeof getPrimaryFace>,
+  now: number
 ): AdvanceResult {
   if (
     session.challengeStartedAt &&
-    Date.now() - session.challengeStartedAt >
-      session.timeouts.challengeTimeoutMs
+    now - session.challengeStartedAt > session.timeouts.challengeTimeoutMs
   ) {
     return fail(LivenessErrorState.CHALLENGE_TIMEOUT, "Challenge timed out");
   }
@@ -479,14 +562,23 @@ function processChallenging(
   if (nextType === undefined) {
     return toSnapshot(session);
   }
+  return beginChallenge(session, nextType, now);
+}
+
+/** Publish the challenge at currentIndex and reset its per-challenge tracking. */
+function beginChallenge(
+  session: LivenessSession,
+  type: ChallengeType,
+  now: number
+): AdvanceResult {
   session.challenge = {
-    type: nextType,
+    type,
     index: session.currentIndex,
     total: session.challenges.length,
     progress: 0,
-    hint: getHintForChallenge(nextType),
+    hint: getHintForChallenge(type),
   };
-  session.challengeStartedAt = Date.now();
+  session.challengeStartedAt = now;
   session.consecutiveChallengePasses = 0;
   session.turnCentered = false;
   session.turnStartYaw = null;
@@ -534,6 +626,7 @@ async function processVerifying(
   }
 
   const draftUpdated = await writeLivenessResult(session, realScore, liveScore);
+  stashBaselineEmbedding(session);
 
   return {
     phase: "completed",
@@ -598,16 +691,19 @@ function evaluateChallenge(
   session: LivenessSession
 ): { passed: boolean; progress: number; hint: string } {
   if (type === "smile") {
-    return evaluateSmile(face, session);
+    return evaluateSmile(session);
   }
   return evaluateTurn(type, face, result, session);
 }
 
-function evaluateSmile(
-  face: DetectedFace,
-  session: LivenessSession
-): { passed: boolean; progress: number; hint: string } {
-  const happy = getHappyScore(face);
+function evaluateSmile(session: LivenessSession): {
+  passed: boolean;
+  progress: number;
+  hint: string;
+} {
+  // advanceFrame already scored this frame's face; reuse it rather than
+  // re-walking the emotion list.
+  const happy = session.lastHappyScore ?? 0;
   const baseline = session.baselineHappy ?? 0;
   const delta = happy - baseline;
   const progress = Math.min(Math.round(happy * 100), 100);
@@ -672,17 +768,14 @@ function evaluateTurn(
   return { passed, progress, hint };
 }
 
+const CHALLENGE_HINTS: Record<ChallengeType, string> = {
+  smile: "Smile!",
+  turn_left: "Turn your head to the left",
+  turn_right: "Turn your head to the right",
+};
+
 function getHintForChallenge(type: ChallengeType): string {
-  switch (type) {
-    case "smile":
-      return "Smile!";
-    case "turn_left":
-      return "Turn your head to the left";
-    case "turn_right":
-      return "Turn your head to the right";
-    default:
-      return "";
-  }
+  return CHALLENGE_HINTS[type] ?? "";
 }
 
 // ---------------------------------------------------------------------------
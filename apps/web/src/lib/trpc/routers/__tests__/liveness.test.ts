@@ -7,6 +7,11 @@ import { beforeEach, describe, expect, it, vi } from "vitest";
 import { livenessRouter } from "@/lib/trpc/routers/liveness";
 
 const mockDetectFromBase64 = vi.fn();
+const mockDetectFromBuffer = vi.fn();
+const mockDetectFromTensor = vi.fn();
+const mockCropFaceRegion = vi.fn();
+const mockGetHumanServer = vi.fn();
+const mockTakeBaselineEmbedding = vi.fn();
 const mockGetIdentityDraftById = vi.fn();
 const mockUpdateIdentityDraft = vi.fn();
 
@@ -18,7 +23,23 @@ vi.mock("@/lib/identity/liveness/human/server", async (importOriginal) => {
   return {
     ...actual,
     detectFromBase64: (...args: unknown[]) => mockDetectFromBase64(...args),
-    getHumanServer: vi.fn(),
+    detectFromBuffer: (...args: unknown[]) => mockDetectFromBuffer(...args),
+    detectFromTensor: (...args: unknown[]) => mockDetectFromTensor(...args),
+    getHumanServer: (...args: unknown[]) => mockGetHumanServer(...args),
+  };
+});
+
+vi.mock("@/lib/identity/document/image-processing", () => ({
+  cropFaceRegion: (...args: unknown[]) => mockCropFaceRegion(...args),
+}));
+
+vi.mock("@/lib/identity/liveness/session", async (importOriginal) => {
+  const actual =
+    await importOriginal<typeof import("@/lib/identity/liveness/session")>();
+  return {
+    ...actual,
+    takeBaselineEmbedding: (...args: unknown[]) =>
+      mockTakeBaselineEmbedding(...args),
   };
 });
 
@@ -51,6 +72,8 @@ describe("faceMatch selfie hash binding", () => {
   beforeEach(() => {
     vi.clearAllMocks();
     mockDetectFromBase64.mockResolvedValue({ face: [] });
+    mockDetectFromBuffer.mockResolvedValue({ face: [] });
+    mockTakeBaselineEmbedding.mockReturnValue(null);
   });
 
   it("rejects when liveness not completed (null verifiedSelfieHash)", async () => {
@@ -95,8 +118,9 @@ describe("faceMatch selfie hash binding", () => {
       userId: "test-user",
       verifiedSelfieHash: SELFIE_HASH,
     });
-    // detectFromBase64 returns no faces → code reaches detection but finds no match
+    // Detection returns no faces → code reaches detection but finds no match
     mockDetectFromBase64.mockResolvedValue({ face: [] });
+    mockDetectFromBuffer.mockResolvedValue({ face: [] });
 
     const caller = createCaller(authedSession);
     const result = await caller.matchFace({
@@ -111,3 +135,148 @@ describe("faceMatch selfie hash binding", () => {
     expect(result.idFaceExtracted).toBe(false);
   });
 });
+
+describe("faceMatch baseline embedding reuse", () => {
+  const ID_IMAGE = "data:image/jpeg;base64,aWQtaW1hZ2U=";
+  const SELFIE = "data:image/jpeg;base64,/9j/test-selfie-data";
+  const SELFIE_HASH = createHash("sha256").update(SELFIE).digest("hex");
+
+  beforeEach(() => {
+    vi.clearAllMocks();
+    mockGetIdentityDraftById.mockResolvedValue({
+      id: "draft-1",
+      userId: "test-user",
+      verifiedSelfieHash: SELFIE_HASH,
+    });
+    mockGetHumanServer.mockResolvedValue({
+      match: { similarity: () => 0.9 },
+    });
+    mockDetectFromBuffer.mockResolvedValue({
+      face: [{ embedding: [0.1, 0.2, 0.3] }],
+    });
+  });
+
+  it("skips selfie detection when the liveness engine stashed its embedding", async () => {
+    mockTakeBaselineEmbedding.mockReturnValue([0.1, 0.2, 0.3]);
+
+    const caller = createCaller(authedSession);
+    const result = await caller.matchFace({
+      idImage: ID_IMAGE,
+      selfieImage: SELFIE,
+      draftId: "draft-1",
+    });
+
+    expect(mockTakeBaselineEmbedding).toHaveBeenCalledWith(
+      SELFIE_HASH,
+      "test-user"
+    );
+    expect(mockDetectFromBase64).not.toHaveBeenCalled();
+    expect(mockDetectFromBuffer).toHaveBeenCalledTimes(1);
+    expect(mockDetectFromBuffer).toHaveBeenCalledWith(
+      Buffer.from("id-image")
+    );
+    expect(result).toMatchObject({ matched: true, confidence: 0.9 });
+  });
+
+  it("detects the selfie when no stashed embedding matches", async () => {
+    mockTakeBaselineEmbedding.mockReturnValue(null);
+    mockDetectFromBase64.mockResolvedValue({
+      face: [{ embedding: [0.1, 0.2, 0.3] }],
+    });
+
+    const caller = createCaller(authedSession);
+    await caller.matchFace({
+      idImage: ID_IMAGE,
+      selfieImage: SELFIE,
+      draftId: "draft-1",
+    });
+
+    expect(mockDetectFromBuffer).toHaveBeenCalledTimes(1);
+    expect(mockDetectFromBase64).toHaveBeenCalledTimes(1);
+    expect(mockDetectFromBase64).toHaveBeenCalledWith(SELFIE);
+  });
+});
+
+describe("faceMatch ID face crop", () => {
+  const ID_IMAGE = "data:image/jpeg;base64,aWQtaW1hZ2U=";
+  const SELFIE = "data:image/jpeg;base64,/9j/test-selfie-data";
+
+  beforeEach(() => {
+    vi.clearAllMocks();
+    mockTakeBaselineEmbedding.mockReturnValue([0.1, 0.2, 0.3]);
+    mockGetHumanServer.mockResolvedValue({
+      match: { similarity: () => 0.9 },
+    });
+  });
+
+  it("crops the normalized boxRaw and re-detects on the crop tensor", async () => {
+    const cropTensor = { dispose: vi.fn() };
+    const similarity = vi.fn(() => 0.9);
+    mockGetHumanServer.mockResolvedValue({ match: { similarity } });
+    mockDetectFromBuffer.mockResolvedValue({
+      face: [
+        {
+          box: [400, 300, 200, 250],
+          boxRaw: [0.25, 0.2, 0.125, 0.16],
+          embedding: [0.9, 0.9, 0.9],
+        },
+      ],
+    });
+    mockCropFaceRegion.mockResolvedValue({
+      tensor: cropTensor,
+      previewDataUrl: "data:image/jpeg;base64,preview",
+    });
+    mockDetectFromTensor.mockResolvedValue({
+      face: [{ embedding: [0.4, 0.5, 0.6] }],
+    });
+
+    const caller = createCaller(authedSession);
+    const result = await caller.matchFace({
+      idImage: ID_IMAGE,
+      selfieImage: SELFIE,
+    });
+
+    expect(mockCropFaceRegion).toHaveBeenCalledWith(Buffer.from("id-image"), {
+      x: 0.25,
+      y: 0.2,
+      width: 0.125,
+      height: 0.16,
+    });
+    expect(mockDetectFromTensor).toHaveBeenCalledWith(cropTensor);
+    expect(cropTensor.dispose).toHaveBeenCalledTimes(1);
+    // The match uses the crop's embedding, not the uncropped detection's.
+    expect(similarity).toHaveBeenCalledWith([0.4, 0.5, 0.6], [0.1, 0.2, 0.3]);
+    expect(result).toMatchObject({
+      matched: true,
+      idFaceExtracted: true,
+      idFaceImage: "data:image/jpeg;base64,preview",
+    });
+  });
+
+  it("falls back to the uncropped detection and still disposes the crop", async () => {
+    const cropTensor = { dispose: vi.fn() };
+    mockDetectFromBuffer.mockResolvedValue({
+      face: [
+        {
+          box: [400, 300, 200, 250],
+          boxRaw: [0.25, 0.2, 0.125, 0.16],
+          embedding: [0.1, 0.2, 0.3],
+        },
+      ],
+    });
+    mockCropFaceRegion.mockResolvedValue({
+      tensor: cropTensor,
+      previewDataUrl: "data:image/jpeg;base64,preview",
+    });
+    mockDetectFromTensor.mockRejectedValue(new Error("detect failed"));
+
+    const caller = createCaller(authedSession);
+    const result = await caller.matchFace({
+      idImage: ID_IMAGE,
+      selfieImage: SELFIE,
+    });
+
+    expect(cropTensor.dispose).toHaveBeenCalledTimes(1);
+    expect(result).toMatchObject({ matched: true, idFaceExtracted: true });
+  });
+});
@@ -21,16 +21,25 @@ import {
   updateIdentityDraft,
 } from "@/lib/db/queries/identity";
 import { createRateLimiter } from "@/lib/http/rate-limit";
-import { cropFaceRegion } from "@/lib/identity/document/image-processing";
+import {
+  cropFaceRegion,
+  type FaceCrop,
+} from "@/lib/identity/document/image-processing";
 import {
   getEmbeddingVector,
   getLargestFace,
 } from "@/lib/identity/liveness/human/metrics";
 import {
   detectFromBase64,
+  detectFromBuffer,
+  detectFromTensor,
   getHumanServer,
+  stripDataUrl,
 } from "@/lib/identity/liveness/human/server";
-import { hashSelfie } from "@/lib/identity/liveness/session";
+import {
+  hashSelfie,
+  takeBaselineEmbedding,
+} from "@/lib/identity/liveness/session";
 import { FACE_MATCH_MIN_CONFIDENCE } from "@/lib/identity/liveness/thresholds";
 
 import { protectedProcedure, router } from "../server";
@@ -53,6 +62,53 @@ const rateLimitedProcedure = protectedProcedure.use(({ ctx, next }) => {
   return next({ ctx });
 });
 
+type DetectionResult = Awaited<ReturnType<typeof detectFromBase64>>;
+
+/**
+ * Detect the ID face, then re-detect on a padded crop of it: small faces in
+ * large documents embed better with more pixels. Falls back to the initial
+ * detection if cropping fails.
+ *
+ * The ID is base64-decoded once and the bytes are shared by both passes.
+ */
+async function detectIdFace(
+  idImage: string
+): Promise<{ result: DetectionResult; previewDataUrl: string | null }> {
+  const idBuffer = Buffer.from(stripDataUrl(idImage), "base64");
+  const initial = await detectFromBuffer(idBuffer);
+  const face = getLargestFace(initial);
+
+  // boxRaw is normalized, so the crop maps back onto the full-resolution
+  // ID even when detection ran on a downscaled copy.
+  if (!face?.boxRaw) {
+    return { result: initial, previewDataUrl: null };
+  }
+
+  let crop: FaceCrop | null = null;
+  try {
+    const box = Array.isArray(face.boxRaw)
+      ? {
+          x: face.boxRaw[0],
+          y: face.boxRaw[1],
+          width: face.boxRaw[2],
+          height: face.boxRaw[3],
+        }
+      : face.boxRaw;
+
+    // Detect on the crop pixels directly; the data URL is only a preview.
+    crop = await cropFaceRegion(idBuffer, box);
+    return {
+      result: await detectFromTensor(crop.tensor),
+      previewDataUrl: crop.previewDataUrl,
+    };
+  } catch {
+    /* Crop failed, fallback to initial detection result */
+    return { result: initial, previewDataUrl: crop?.previewDataUrl ?? null };
+  } finally {
+    crop?.tensor.dispose();
+  }
+}
+
 export const livenessRouter = router({
   /**
    * Face matching for dashboard verification.
@@ -62,122 +118,78 @@ export const livenessRouter = router({
   matchFace: rateLimitedProcedure
     .input(faceMatchSchema)
     .mutation(async ({ ctx, input }) => {
-      const startTime = Date.now();
+      const startTime = performance.now();
       const userId = ctx.session.user.id;
       const minConfidence = input.minConfidence ?? FACE_MATCH_MIN_CONFIDENCE;
+      const selfieHash = hashSelfie(input.selfieImage);
+      let croppedFaceDataUrl: string | null = null;
+
+      const elapsedMs = () => Math.round(performance.now() - startTime);
+      const noMatch = (error: string, idFaceExtracted = false) => ({
+        matched: false,
+        confidence: 0,
+        distance: 1,
+        threshold: minConfidence,
+        processingTimeMs: elapsedMs(),
+        idFaceExtracted,
+        idFaceImage: croppedFaceDataUrl ?? undefined,
+        error,
+      });
 
       // Validate draft ownership and selfie binding before any expensive work
       if (input.draftId) {
         const draft = await getIdentityDraftById(input.draftId);
         if (!draft) {
-          return {
-            matched: false,
-            confidence: 0,
-            distance: 1,
-            threshold: minConfidence,
-            processingTimeMs: Date.now() - startTime,
-            idFaceExtracted: false,
-            error: "Identity draft not found",
-          };
+          return noMatch("Identity draft not found");
         }
         if (draft.userId !== userId) {
-          return {
-            matched: false,
-            confidence: 0,
-            distance: 1,
-            threshold: minConfidence,
-            processingTimeMs: Date.now() - startTime,
-            idFaceExtracted: false,
-            error: "Draft does not belong to this user",
-          };
+          return noMatch("Draft does not belong to this user");
         }
         if (!draft.verifiedSelfieHash) {
-          return {
-            matched: false,
-            confidence: 0,
-            distance: 1,
-            threshold: minConfidence,
-            processingTimeMs: Date.now() - startTime,
-            idFaceExtracted: false,
-            error: "Liveness not completed for this draft",
-          };
+          return noMatch("Liveness not completed for this draft");
         }
-        const selfieHash = hashSelfie(input.selfieImage);
         if (selfieHash !== draft.verifiedSelfieHash) {
-          return {
-            matched: false,
-            confidence: 0,
-            distance: 1,
-            threshold: minConfidence,
-            processingTimeMs: Date.now() - startTime,
-            idFaceExtracted: false,
-            error: "Selfie does not match liveness session",
-          };
+          return noMatch("Selfie does not match liveness session");
         }
       }
 
       const human = await getHumanServer();
 
-      const idResultInitial = await detectFromBase64(input.idImage);
-      const idFaceInitial = getLargestFace(idResultInitial);
-
-      let idResult = idResultInitial;
-      let croppedFaceDataUrl: string | null = null;
-
-      if (idFaceInitial?.box) {
-        try {
-          const box = Array.isArray(idFaceInitial.box)
-            ? {
-                x: idFaceInitial.box[0],
-                y: idFaceInitial.box[1],
-                width: idFaceInitial.box[2],
-                height: idFaceInitial.box[3],
-              }
-            : idFaceInitial.box;
-
-          croppedFaceDataUrl = await cropFaceRegion(input.idImage, box);
-          idResult = await detectFromBase64(croppedFaceDataUrl);
-        } catch {
-          /* Crop failed, fallback to initial detection result */
-        }
-      }
-
-      const selfieResult = await detectFromBase64(input.selfieImage);
-
-      const idFace = getLargestFace(idResult);
-      const selfieFace = getLargestFace(selfieResult);
-
-      if (!(idFace && selfieFace)) {
-        return {
-          matched: false,
-          confidence: 0,
-          distance: 1,
-          threshold: minConfidence,
-          processingTimeMs: Date.now() - startTime,
-          idFaceExtracted: Boolean(idFace),
-          idFaceImage: croppedFaceDataUrl ?? undefined,
-          error: idFace
+      // A selfie fresh from the liveness engine was already embedded there;
+      // only detect it again when no stashed baseline embedding matches.
+      const stashedSelfieEmb = takeBaselineEmbedding(selfieHash, userId);
+
+      // The ID and selfie pipelines are independent, so run them together;
+      // the detection semaphore still bounds concurrent model work.
+      const [idDetection, selfieFace] = await Promise.all([
+        detectIdFace(input.idImage),
+        stashedSelfieEmb
+          ? null
+          : detectFromBase64(input.selfieImage).then(getLargestFace),
+      ]);
+      croppedFaceDataUrl = idDetection.previewDataUrl;
+
+      const idFace = getLargestFace(idDetection.result);
+
+      if (!(idFace && (stashedSelfieEmb || selfieFace))) {
+        return noMatch(
+          idFace
             ? "No face detected in selfie"
             : "No face detected in ID document",
-        };
+          Boolean(idFace)
+        );
       }
 
       const idEmb = getEmbeddingVector(idFace);
-      const selfieEmb = getEmbeddingVector(selfieFace);
+      const selfieEmb = stashedSelfieEmb ?? getEmbeddingVector(selfieFace);
 
       if (!(idEmb && selfieEmb)) {
-        return {
-          matched: false,
-          confidence: 0,
-          distance: 1,
-          threshold: minConfidence,
-          processingTimeMs: Date.now() - startTime,
-          idFaceExtracted: true,
-          idFaceImage: croppedFaceDataUrl ?? undefined,
-          error: idEmb
+        return noMatch(
+          idEmb
             ? "Failed to extract selfie face embedding"
             : "Failed to extract ID face embedding",
-        };
+          true
+        );
       }
 
       const confidence = human.match.similarity(idEmb, selfieEmb);
@@ -197,7 +209,7 @@ export const livenessRouter = router({
         confidence,
         distance: 1 - confidence,
         threshold: minConfidence,
-        processingTimeMs: Date.now() - startTime,
+        processingTimeMs: elapsedMs(),
         idFaceExtracted: true,
         idFaceImage: croppedFaceDataUrl ?? undefined,
         error: null,